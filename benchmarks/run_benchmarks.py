@@ -0,0 +1,337 @@
+#! /usr/bin/env python3
+
+'''
+Benchmarks for the parser and differ hot paths.
+
+Each benchmark is run against generated corpora and reports throughput
+(MB/s of input text), latency percentiles, and peak memory (measured
+with tracemalloc in a separate, untimed run).
+
+Usage::
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --compare results.json
+
+Use ``--quick`` for smaller corpora and fewer repetitions, and
+``--filter`` to run only the benchmarks whose names contain a
+substring.
+'''
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Sequence, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from superdiff import Differ  # noqa: E402
+from superdiff.parser import Parser  # noqa: E402
+
+
+PARSER_FLAGS = (
+    'ignore_case',
+    'ignore_non_newline_whitespace',
+    'ignore_non_newline_whitespace_changes',
+    'ignore_newline_changes',
+    'ignore_blank_lines',
+    'ignore_leading_whitespace',
+    'ignore_trailing_whitespace',
+)
+
+
+# ---------------------------------------------------------------------------
+# Corpora
+
+
+def _random_lines(num_lines: int, seed: int=0) -> List[str]:
+    rand = random.Random(seed)
+    words = ['spam', 'egg', 'sausage', 'bacon', 'Lobster', 'THERMIDOR', '42', '-1.5']
+    return [' '.join(rand.choice(words) for _ in range(rand.randint(1, 8)))
+            for _ in range(num_lines)]
+
+
+def identical_corpus(num_lines: int) -> Tuple[str, str]:
+    text = '\n'.join(_random_lines(num_lines))
+    return text, text
+
+
+def single_difference_corpus(num_lines: int) -> Tuple[str, str]:
+    lines = _random_lines(num_lines)
+    changed = list(lines)
+    changed[num_lines // 2] = 'this line is different'
+    return '\n'.join(lines), '\n'.join(changed)
+
+
+def scattered_differences_corpus(num_lines: int) -> Tuple[str, str]:
+    lines = _random_lines(num_lines)
+    rand = random.Random(1)
+    changed = list(lines)
+    for index in rand.sample(range(num_lines), num_lines // 20):
+        changed[index] = changed[index].upper()
+    return '\n'.join(lines), '\n'.join(changed)
+
+
+def repetitive_corpus(num_lines: int) -> Tuple[str, str]:
+    half = num_lines // 2
+    first = '0\n' * num_lines
+    second = '0\n' * half + '1\n' + '0\n' * (num_lines - half - 1)
+    return first, second
+
+
+def crlf_corpus(num_lines: int) -> Tuple[str, str]:
+    lines = _random_lines(num_lines)
+    first = '\r\n'.join(' \t' + line + '  ' for line in lines)
+    second = '\n\n'.join(line for line in lines)
+    return first, second
+
+
+CORPORA = (
+    ('identical', identical_corpus),
+    ('single_difference', single_difference_corpus),
+    ('scattered_differences', scattered_differences_corpus),
+    ('repetitive', repetitive_corpus),
+    ('crlf', crlf_corpus),
+)  # type: Sequence[Tuple[str, Callable[[int], Tuple[str, str]]]]
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+
+
+def _percentile(sorted_values: Sequence[float], percent: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(percent / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(func: Callable[[], object], num_bytes: int, num_lines: int,
+            repeat: int) -> Dict[str, float]:
+    '''
+    Runs func repeat times and returns timing, throughput, and peak
+    memory statistics.
+    '''
+    func()  # Warm up
+
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    median = _percentile(timings, 50)
+    return {
+        'repeat': repeat,
+        'bytes': num_bytes,
+        'lines': num_lines,
+        'mb_per_sec': num_bytes / median / 1e6 if median else float('inf'),
+        'usec_per_line': median / num_lines * 1e6 if num_lines else 0.0,
+        'min_sec': timings[0],
+        'p50_sec': median,
+        'p90_sec': _percentile(timings, 90),
+        'p99_sec': _percentile(timings, 99),
+        'max_sec': timings[-1],
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import(statement: str, repeat: int) -> Dict[str, float]:
+    '''
+    Runs statement in repeat fresh interpreters with ``-X importtime``
+    and returns statistics for the time spent importing superdiff and
+    everything it imports.
+    '''
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', statement],
+            cwd=_REPO_ROOT, stderr=subprocess.PIPE, universal_newlines=True,
+            check=True).stderr
+        timings.append(_superdiff_import_seconds(output))
+
+    timings.sort()
+    return {
+        'repeat': repeat,
+        'min_sec': timings[0],
+        'p50_sec': _percentile(timings, 50),
+        'p90_sec': _percentile(timings, 90),
+        'p99_sec': _percentile(timings, 99),
+        'max_sec': timings[-1],
+    }
+
+
+def _superdiff_import_seconds(importtime_output: str) -> float:
+    '''
+    Sums the cumulative times of the top-level imports reported by
+    ``-X importtime``, starting from the first superdiff import.
+    Imports before that are part of interpreter startup.
+    '''
+    total_usec = 0
+    started = False
+    for line in importtime_output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line.split('|')
+        # Skips the header ("self [us] | cumulative | imported package")
+        # and nested imports, which are already counted by their parent.
+        if not cumulative.strip().isdigit() or name.startswith('  '):
+            continue
+        started = started or name.strip().startswith('superdiff')
+        if started:
+            total_usec += int(cumulative)
+
+    return total_usec / 1e6
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+
+
+IMPORT_BENCHMARKS = (
+    ('import/superdiff', 'import superdiff'),
+    ('import/superdiff.Differ.equal', "import superdiff; superdiff.Differ().equal('', '')"),
+    ('import/superdiff.Differ.compare',
+     "import superdiff; superdiff.Differ().compare('0\\n0', '1\\n1')"),
+)
+
+
+def _flag_combinations() -> List[Dict[str, bool]]:
+    return [dict(zip(PARSER_FLAGS, values))
+            for values in itertools.product((False, True), repeat=len(PARSER_FLAGS))]
+
+
+def _flags_name(flags: Dict[str, bool]) -> str:
+    enabled = [flag[len('ignore_'):] for flag in PARSER_FLAGS if flags[flag]]
+    return '+'.join(enabled) if enabled else 'none'
+
+
+def iter_benchmarks(num_lines: int) -> List[Tuple[str, Callable[[], object], int, int]]:
+    '''
+    Returns a list of (name, function, input size in bytes, input size
+    in lines) tuples.
+    '''
+    benchmarks = []
+    for corpus_name, make_corpus in CORPORA:
+        first, second = make_corpus(num_lines)
+        num_bytes = len(first.encode()) + len(second.encode())
+        parser = Parser()
+        differ = Differ()
+        benchmarks.append(('parse/' + corpus_name,
+                           lambda parser=parser, first=first: parser.parse(first),
+                           len(first.encode()), num_lines))
+        benchmarks.append(('compare/' + corpus_name,
+                           lambda differ=differ, first=first, second=second:
+                               list(differ.compare(first, second)),
+                           num_bytes, num_lines * 2))
+
+    # Per-line cost of every Parser flag combination on a smaller,
+    # whitespace-heavy corpus. Includes computing each line's
+    # transformed text, since that is where the flags are applied.
+    flags_num_lines = max(1, num_lines // 10)
+    first, _ = crlf_corpus(flags_num_lines)
+    for flags in _flag_combinations():
+        parser = Parser(**flags)
+        benchmarks.append(('parse_flags/' + _flags_name(flags),
+                           lambda parser=parser, first=first:
+                               [line.transformed_text for line in parser.parse(first)],
+                           len(first.encode()), flags_num_lines))
+
+    return benchmarks
+
+
+def run(num_lines: int, repeat: int, name_filter: str) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name, func, num_bytes, benchmark_lines in iter_benchmarks(num_lines):
+        if name_filter not in name:
+            continue
+        results[name] = measure(func, num_bytes, benchmark_lines, repeat)
+        print('{:<60} {:>9.2f} MB/s {:>8.2f} us/line  p50 {:>9.4f}s  p99 {:>9.4f}s  '
+              'peak {:>8.1f} MB'.format(
+                  name, results[name]['mb_per_sec'], results[name]['usec_per_line'],
+                  results[name]['p50_sec'], results[name]['p99_sec'],
+                  results[name]['peak_memory_bytes'] / 1e6))
+        sys.stdout.flush()
+
+    for name, statement in IMPORT_BENCHMARKS:
+        if name_filter not in name:
+            continue
+        results[name] = measure_import(statement, max(repeat, 10))
+        print('{:<60} p50 {:>9.4f}s  p99 {:>9.4f}s'.format(
+            name, results[name]['p50_sec'], results[name]['p99_sec']))
+        sys.stdout.flush()
+
+    return results
+
+
+def compare_results(baseline: Dict[str, Dict[str, float]],
+                    current: Dict[str, Dict[str, float]]) -> None:
+    print()
+    print('{:<60} {:>10} {:>10} {:>8}'.format('benchmark', 'base p50', 'new p50', 'ratio'))
+    for name, result in current.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]['p50_sec']
+        new = result['p50_sec']
+        print('{:<60} {:>10.4f} {:>10.4f} {:>7.2f}x'.format(
+            name, old, new, new / old if old else float('inf')))
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    arg_parser.add_argument('--lines', type=int, default=100000,
+                            help='Number of lines in each generated corpus.')
+    arg_parser.add_argument('--repeat', type=int, default=5,
+                            help='Number of timed runs per benchmark.')
+    arg_parser.add_argument('--quick', action='store_true',
+                            help='Use 10000-line corpora and 3 repetitions.')
+    arg_parser.add_argument('--filter', default='',
+                            help='Only run benchmarks whose names contain this string.')
+    arg_parser.add_argument('--output', help='Save results as JSON to this file.')
+    arg_parser.add_argument('--compare', help='JSON results file to compare against.')
+    args = arg_parser.parse_args()
+
+    if args.quick:
+        args.lines = 10000
+        args.repeat = 3
+
+    results = run(args.lines, args.repeat, args.filter)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'lines': args.lines,
+                'results': results,
+            }, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare_results(json.load(f)['results'], results)
+
+
+if __name__ == '__main__':
+    main()
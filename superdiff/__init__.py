@@ -1 +1,34 @@
-from .differ import Differ  # noqa
+# Submodules are imported on first attribute access (PEP 562) so that
+# ``import superdiff`` stays cheap for short-lived processes.
+#
+# For the same reason, the submodules only import typing for type
+# checkers, under ``MYPY = False`` / ``if MYPY:``, and use string
+# annotations. (typing.TYPE_CHECKING would require importing typing.)
+import sys
+
+_LAZY_ATTRIBUTES = {
+    'Differ': 'differ',
+    'DiffMetrics': 'differ',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError("module 'superdiff' has no attribute '{}'".format(name))
+
+    import importlib
+    module = importlib.import_module('.' + _LAZY_ATTRIBUTES[name], __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+# Module __getattr__ requires Python 3.7.
+if sys.version_info < (3, 7):
+    from .differ import Differ, DiffMetrics  # noqa
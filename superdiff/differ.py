@@ -1,9 +1,17 @@
-import difflib
 import itertools
-from typing import Iterable, Tuple
+import time
 
+from .hunks import HunkDiff
+from .matcher import PatienceMatcher
 from .parser import Parser
 
+MYPY = False
+if MYPY:  # pragma: no cover
+    from typing import Callable, Iterable, List, Optional, Sequence, Tuple, Union  # noqa: F401
+
+    from .parser import Line  # noqa: F401
+    from .shared import SharedDocument, SharedLine  # noqa: F401
+
 
 class Differ:
     r'''
@@ -27,7 +35,8 @@ class Differ:
                  ignore_newline_changes: bool=False,
                  ignore_blank_lines: bool=False,
                  ignore_leading_whitespace: bool=False,
-                 ignore_trailing_whitespace: bool=False) -> None:
+                 ignore_trailing_whitespace: bool=False,
+                 metrics_callback: 'Optional[Callable[[DiffMetrics], None]]'=None) -> None:
         r'''
         :param ignore_case: Ignore case differences between the two
             texts.
@@ -50,6 +59,10 @@ class Differ:
         :param ignore_trailing_whitespace: Ignore whitespace characters
             at the end of lines. Note that this will cause empty
             lines to be treated as the empty string.
+        :param metrics_callback: When not None, this function will be
+            called with a :class:`DiffMetrics` object after each call
+            to :meth:`compare` or :meth:`compare_hunks`. :meth:`equal`
+            does not report metrics.
         '''
         self._parser = Parser(
             ignore_case=ignore_case,
@@ -60,8 +73,18 @@ class Differ:
             ignore_leading_whitespace=ignore_leading_whitespace,
             ignore_trailing_whitespace=ignore_trailing_whitespace
         )
+        self._metrics_callback = metrics_callback
+
+    @property
+    def parser(self) -> Parser:
+        '''
+        The Parser used to split texts into lines.
+        '''
+        return self._parser
 
-    def compare(self, first: str, second: str) -> Iterable[Tuple[str, str, str]]:
+    def compare(self,
+                first: 'Union[str, SharedDocument]',
+                second: 'Union[str, SharedDocument]') -> 'Iterable[Tuple[str, str, str]]':
         '''
         Performs a line-by-line comparision of the strings first and
         second and returns a sequence of ``(tag, left, right)`` tuples
@@ -71,27 +94,184 @@ class Differ:
         https://docs.python.org/3.5/library/difflib.html#difflib.SequenceMatcher.get_opcodes
         and have the same meanings.
 
+        Matching is anchored on lines that appear exactly once in each
+        string, and runs of identical lines are compressed before
+        falling back to ``difflib.SequenceMatcher``. See
+        :class:`superdiff.matcher.PatienceMatcher` for details.
+
+        Either string can be replaced with a
+        :class:`superdiff.shared.SharedDocument` produced by this
+        Differ's :attr:`parser` (or one with the same settings), in
+        which case it is not parsed again.
+
         If the two strings are equal, returns an empty iterable.
         '''
-        result = tuple()  # type: Iterable[Tuple[str, str, str]]
-        parsed_first = self._parser.parse(first)
-        parsed_second = self._parser.parse(second)
-        matcher = difflib.SequenceMatcher(a=parsed_first, b=parsed_second)
+        start_time = time.perf_counter()
+        parsed_first = self._parse(first)
+        parse_first_time = time.perf_counter()
+        parsed_second = self._parse(second)
+        parse_second_time = time.perf_counter()
+
+        matcher = PatienceMatcher(a=parsed_first.keys, b=parsed_second.keys)
+        opcodes = matcher.get_opcodes()
+        match_time = time.perf_counter()
 
+        result = []  # type: List[Tuple[str, str, str]]
         sequences_equal = True
 
-        for tag, first_start, first_end, second_start, second_end in matcher.get_opcodes():
+        for tag, first_start, first_end, second_start, second_end in opcodes:
             if tag != 'equal':
                 sequences_equal = False
 
             pairs = itertools.zip_longest(
-                (line.original_text for line in parsed_first[first_start:first_end]),
-                (line.original_text for line in parsed_second[second_start:second_end]),
+                (line.original_text for line in parsed_first.lines[first_start:first_end]),
+                (line.original_text for line in parsed_second.lines[second_start:second_end]),
                 fillvalue='')
-            tuples = [(tag,) + pair for pair in pairs]
-            result = itertools.chain(result, tuples)
+            result.extend((tag,) + pair for pair in pairs)
+
+        diff = tuple() if sequences_equal else result  # type: Iterable[Tuple[str, str, str]]
+
+        if self._metrics_callback is not None:
+            self._report_metrics(start_time, parse_first_time, parse_second_time, match_time,
+                                 parsed_first.lines, parsed_second.lines, matcher)
+
+        return diff
+
+    def compare_hunks(self,
+                      first: 'Union[str, SharedDocument]',
+                      second: 'Union[str, SharedDocument]',
+                      max_hunks: 'Optional[int]'=None,
+                      max_bytes: 'Optional[int]'=None) -> HunkDiff:
+        '''
+        Like :meth:`compare`, but returns one
+        :class:`superdiff.hunks.Hunk` per opcode instead of one tuple
+        per line. Hunks keep the line numbers of each side and only
+        build their text when it is requested.
+
+        :param max_hunks: When not None, at most this many non-equal
+            hunks are returned.
+        :param max_bytes: When not None, hunks are only included while
+            the result's :meth:`superdiff.hunks.HunkDiff.to_json`
+            output (with ``include_equal_text`` False) stays within
+            this many bytes.
+
+        If either limit is reached, the result's ``truncated``
+        attribute is True. Use :meth:`superdiff.hunks.HunkDiff.to_json`
+        to serialize the result.
+
+        If the two strings are equal, returns a HunkDiff with no hunks.
+        '''
+        start_time = time.perf_counter()
+        parsed_first = self._parse(first)
+        parse_first_time = time.perf_counter()
+        parsed_second = self._parse(second)
+        parse_second_time = time.perf_counter()
+
+        matcher = PatienceMatcher(a=parsed_first.keys, b=parsed_second.keys)
+        opcodes = matcher.get_opcodes()
+        match_time = time.perf_counter()
+
+        diff = HunkDiff.from_opcodes(opcodes, parsed_first.lines, parsed_second.lines,
+                                     max_hunks=max_hunks, max_bytes=max_bytes)
+
+        if self._metrics_callback is not None:
+            self._report_metrics(start_time, parse_first_time, parse_second_time, match_time,
+                                 parsed_first.lines, parsed_second.lines, matcher)
+
+        return diff
+
+    def equal(self, first: 'Union[str, SharedDocument]',
+              second: 'Union[str, SharedDocument]') -> bool:
+        '''
+        Returns True if first and second are equal under this Differ's
+        settings, i.e. if :meth:`compare` would return an empty
+        iterable. This is cheaper than :meth:`compare` since no diff
+        is computed.
+        '''
+        return self._parse(first).keys == self._parse(second).keys
+
+    def _parse(self, text: 'Union[str, SharedDocument, _ParsedText]') -> '_ParsedText':
+        '''
+        Returns the lines of text along with their transformed text.
+        Transforming is done here so that it's counted as part of
+        parsing in DiffMetrics.
+        '''
+        if isinstance(text, _ParsedText):
+            return text
+
+        # Checking for str rather than SharedDocument avoids importing
+        # superdiff.shared unless it's being used.
+        if isinstance(text, str):
+            lines = self._parser.parse(text)  # type: Sequence[Union[Line, SharedLine]]
+        else:
+            text.check_settings(self._parser)
+            lines = text
+
+        return _ParsedText(lines, [line.transformed_text for line in lines])
+
+    def _report_metrics(self, start_time: float, parse_first_time: float,
+                        parse_second_time: float, match_time: float,
+                        parsed_first: 'Sequence[Union[Line, SharedLine]]',
+                        parsed_second: 'Sequence[Union[Line, SharedLine]]',
+                        matcher: PatienceMatcher) -> None:
+        metrics = DiffMetrics()
+        metrics.parse_first_seconds = parse_first_time - start_time
+        metrics.parse_second_seconds = parse_second_time - parse_first_time
+        metrics.match_seconds = match_time - parse_second_time
+        metrics.materialize_seconds = time.perf_counter() - match_time
+        metrics.first_num_lines = len(parsed_first)
+        metrics.second_num_lines = len(parsed_second)
+        metrics.first_num_tokens = sum(line.num_tokens for line in parsed_first)
+        metrics.second_num_tokens = sum(line.num_tokens for line in parsed_second)
+        metrics.num_opcodes = len(matcher.get_opcodes())
+        metrics.algorithm = matcher.algorithm
+        self._metrics_callback(metrics)
+
+
+class _ParsedText:
+    '''
+    The parsed lines of a text and the transformed text of each line.
+    '''
+
+    __slots__ = ('lines', 'keys')
+
+    def __init__(self, lines: 'Sequence[Union[Line, SharedLine]]', keys: 'List[str]') -> None:
+        self.lines = lines
+        self.keys = keys
+
+
+class DiffMetrics:
+    '''
+    Phase timings and sizes recorded during one call to
+    :meth:`Differ.compare` or :meth:`Differ.compare_hunks`. Times are
+    in seconds, measured with ``time.perf_counter``.
+
+    - parse_first_seconds: Time spent parsing the first string and
+      computing the transformed text of its lines.
+    - parse_second_seconds: Same as above, for the second string.
+    - match_seconds: Time spent computing opcodes.
+    - materialize_seconds: Time spent building the result tuples (or
+      hunks, for compare_hunks).
+    - first_num_lines, second_num_lines: Number of parsed lines.
+    - first_num_tokens, second_num_tokens: Number of parsed tokens.
+    - num_opcodes: Number of opcodes computed by the matcher.
+    - algorithm: The value of
+      :attr:`superdiff.matcher.PatienceMatcher.algorithm`.
+    '''
 
-        if sequences_equal:
-            return tuple()
+    def __init__(self) -> None:
+        self.parse_first_seconds = 0.0
+        self.parse_second_seconds = 0.0
+        self.match_seconds = 0.0
+        self.materialize_seconds = 0.0
+        self.first_num_lines = 0
+        self.second_num_lines = 0
+        self.first_num_tokens = 0
+        self.second_num_tokens = 0
+        self.num_opcodes = 0
+        self.algorithm = ''
 
-        return result
+    @property
+    def total_seconds(self) -> float:
+        return (self.parse_first_seconds + self.parse_second_seconds +
+                self.match_seconds + self.materialize_seconds)
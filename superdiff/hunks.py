@@ -0,0 +1,166 @@
+MYPY = False
+if MYPY:  # pragma: no cover
+    from typing import Iterator, List, Optional, Sequence, Tuple  # noqa: F401
+
+    from .parser import Line  # noqa: F401
+
+
+# The size of to_json's output with no hunks. Uses "false" since it's
+# longer than "true".
+_EMPTY_JSON_SIZE = len(b'{"truncated":false,"hunks":[]}')
+
+
+class Hunk:
+    '''
+    A contiguous range of lines that share the same opcode tag.
+
+    ``tag`` has the same meaning as in
+    https://docs.python.org/3.5/library/difflib.html#difflib.SequenceMatcher.get_opcodes
+    The line ranges are 0-based and half-open:
+    ``[first_start, first_end)`` in the first text and
+    ``[second_start, second_end)`` in the second text.
+
+    The original text of each side is only built when first requested.
+    '''
+
+    __slots__ = ('tag', 'first_start', 'first_end', 'second_start', 'second_end',
+                 '_first_lines', '_second_lines', '_encoded')
+
+    def __init__(self, tag: str, first_start: int, first_end: int,
+                 second_start: int, second_end: int,
+                 first_lines: 'Sequence[Line]', second_lines: 'Sequence[Line]') -> None:
+        self.tag = tag
+        self.first_start = first_start
+        self.first_end = first_end
+        self.second_start = second_start
+        self.second_end = second_end
+        self._first_lines = first_lines
+        self._second_lines = second_lines
+        self._encoded = None  # type: Optional[bytes]
+
+    @property
+    def first_text(self) -> str:
+        '''
+        The original text of this hunk's lines in the first text.
+        '''
+        return ''.join(line.original_text
+                       for line in self._first_lines[self.first_start:self.first_end])
+
+    @property
+    def second_text(self) -> str:
+        '''
+        The original text of this hunk's lines in the second text.
+        '''
+        return ''.join(line.original_text
+                       for line in self._second_lines[self.second_start:self.second_end])
+
+    def _encode(self, include_text: bool) -> bytes:
+        '''
+        Returns this hunk as compact UTF-8 encoded JSON. The default
+        form (text included unless the hunk is equal) is cached, since
+        it's computed both when checking max_bytes and in to_json.
+        '''
+        is_default = include_text == (self.tag != 'equal')
+        if is_default and self._encoded is not None:
+            return self._encoded
+
+        # Imported here since most callers never serialize.
+        import json
+
+        item = [self.tag, self.first_start, self.first_end,
+                self.second_start, self.second_end]  # type: list
+        if include_text:
+            item.extend((self.first_text, self.second_text))
+        encoded = json.dumps(item, separators=(',', ':'), ensure_ascii=False).encode()
+
+        if is_default:
+            self._encoded = encoded
+        return encoded
+
+    def __repr__(self):
+        return 'Hunk({!r}, {}, {}, {}, {})'.format(
+            self.tag, self.first_start, self.first_end, self.second_start, self.second_end)
+
+
+class HunkDiff:
+    '''
+    The result of :meth:`superdiff.Differ.compare_hunks`: a sequence of
+    :class:`Hunk` objects covering both texts, or no hunks at all if
+    the texts are equal.
+
+    If the result was cut short by ``max_hunks`` or ``max_bytes``,
+    ``truncated`` is True and the hunks stop after the last one that
+    fit.
+    '''
+
+    __slots__ = ('hunks', 'truncated')
+
+    def __init__(self, hunks: 'List[Hunk]', truncated: bool=False) -> None:
+        self.hunks = hunks
+        self.truncated = truncated
+
+    @classmethod
+    def from_opcodes(cls, opcodes: 'Sequence[Tuple[str, int, int, int, int]]',
+                     first_lines: 'Sequence[Line]', second_lines: 'Sequence[Line]',
+                     max_hunks: 'Optional[int]'=None,
+                     max_bytes: 'Optional[int]'=None) -> 'HunkDiff':
+        '''
+        Builds a HunkDiff from ``SequenceMatcher``-style opcodes over
+        first_lines and second_lines.
+
+        :param max_hunks: The maximum number of non-equal hunks to
+            include.
+        :param max_bytes: The maximum size of the result's
+            :meth:`to_json` output (with ``include_equal_text`` False).
+            Checking this requires encoding each hunk, which is cached
+            for to_json.
+        '''
+        if all(opcode[0] == 'equal' for opcode in opcodes):
+            return cls([])
+
+        hunks = []  # type: List[Hunk]
+        num_changes = 0
+        num_bytes = _EMPTY_JSON_SIZE
+        for opcode in opcodes:
+            hunk = Hunk(*opcode, first_lines=first_lines, second_lines=second_lines)
+            if hunk.tag != 'equal' and max_hunks is not None and num_changes >= max_hunks:
+                return cls(hunks, truncated=True)
+
+            if max_bytes is not None:
+                separator_size = 1 if hunks else 0
+                num_bytes += separator_size + len(hunk._encode(hunk.tag != 'equal'))
+                if num_bytes > max_bytes:
+                    return cls(hunks, truncated=True)
+
+            if hunk.tag != 'equal':
+                num_changes += 1
+            hunks.append(hunk)
+
+        return cls(hunks)
+
+    def to_json(self, include_equal_text: bool=False) -> bytes:
+        '''
+        Serializes this diff as compact UTF-8 encoded JSON of the form::
+
+            {"truncated": false,
+             "hunks": [[tag, first_start, first_end, second_start, second_end,
+                        first_text, second_text], ...]}
+
+        :param include_equal_text: When False, the text of equal hunks
+            is left out (only their line ranges are included).
+        '''
+        return b''.join((
+            b'{"truncated":', b'true' if self.truncated else b'false', b',"hunks":[',
+            b','.join(hunk._encode(include_equal_text or hunk.tag != 'equal')
+                      for hunk in self.hunks),
+            b']}',
+        ))
+
+    def __len__(self) -> int:
+        return len(self.hunks)
+
+    def __iter__(self) -> 'Iterator[Hunk]':
+        return iter(self.hunks)
+
+    def __getitem__(self, index: int) -> Hunk:
+        return self.hunks[index]
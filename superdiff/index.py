@@ -0,0 +1,164 @@
+from .differ import Differ
+
+MYPY = False
+if MYPY:  # pragma: no cover
+    from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple  # noqa: F401
+
+    from .differ import _ParsedText  # noqa: F401
+
+    Sketch = Tuple[Optional[int], ...]
+
+
+class ReferenceIndex:
+    '''
+    An index over several candidate reference texts that finds the
+    candidate most similar to a given text, so that only one full diff
+    needs to be computed when any of the references is acceptable.
+
+    Each text is fingerprinted by the multiset of its transformed lines
+    (as produced by the Differ's parser, so the Differ's settings are
+    respected). The fingerprint is a one-permutation MinHash sketch:
+    the hashes of the (line, occurrence number) pairs in the text are
+    split into ``sketch_size`` bins, and the smallest hash in each bin
+    is kept.
+
+    The sketch is split into bands of ``band_size`` bins, and references
+    are indexed by their bands (locality-sensitive hashing). A lookup
+    only scores the references that have at least one whole band in
+    common with the text, which references that are much more similar
+    to the text than the rest are very likely to have. If no reference
+    shares a band with the text, every reference is scored, so lookups
+    for texts unlike any of the references take time linear in the
+    number of references.
+
+    Similarity is the estimated Jaccard similarity of the line
+    multisets. This is a proxy for diff size, so the reference returned
+    is not guaranteed to produce the smallest diff.
+
+    The parsed references are kept so that :meth:`compare` doesn't need
+    to parse them again.
+    '''
+
+    def __init__(self, differ: Differ, references: 'Sequence[str]', sketch_size: int=128,
+                 band_size: int=4) -> None:
+        '''
+        :param differ: The Differ used to parse the texts and to compute
+            diffs in :meth:`compare`.
+        :param references: The candidate reference texts.
+        :param sketch_size: The number of hashes kept per text. Larger
+            values give more accurate similarity estimates at the cost
+            of memory and lookup time.
+        :param band_size: The number of hashes per band. Larger values
+            make lookups score fewer references, but make it more likely
+            that a similar reference is only found by scoring all of
+            them.
+        '''
+        if not references:
+            raise ValueError('At least one reference text is required')
+
+        self._differ = differ
+        self._references = list(references)
+        self._sketch_size = sketch_size
+        self._band_size = band_size
+
+        self._parsed_references = []  # type: List[_ParsedText]
+        self._sketches = []  # type: List[Sketch]
+        self._references_by_band = {}  # type: Dict[Tuple[int, Sketch], List[int]]
+        for reference_index, reference in enumerate(self._references):
+            parsed = differ._parse(reference)
+            sketch = self._fingerprint(parsed)
+            self._parsed_references.append(parsed)
+            self._sketches.append(sketch)
+            for band in self._bands(sketch):
+                self._references_by_band.setdefault(band, []).append(reference_index)
+
+    @property
+    def references(self) -> 'Sequence[str]':
+        return self._references
+
+    def closest(self, text: str) -> int:
+        '''
+        Returns the index (into the references passed to the
+        constructor) of the reference text most similar to text.
+        '''
+        return self._closest(self._differ._parse(text))
+
+    def compare(self, text: str) -> 'Tuple[int, Iterable[Tuple[str, str, str]]]':
+        '''
+        Finds the closest reference with :meth:`closest` and returns a
+        tuple of its index and the result of
+        ``differ.compare(reference, text)``.
+        '''
+        parsed = self._differ._parse(text)
+        index = self._closest(parsed)
+        return index, self._differ.compare(self._parsed_references[index], parsed)
+
+    def _closest(self, parsed: '_ParsedText') -> int:
+        sketch = self._fingerprint(parsed)
+        num_lines = len(parsed.keys)
+
+        candidates = set()
+        for band in self._bands(sketch):
+            candidates.update(self._references_by_band.get(band, ()))
+        if not candidates:
+            candidates = set(range(len(self._references)))
+
+        # Ties (including texts with no lines in common with any
+        # reference) go to the reference with the closest number of
+        # lines.
+        return max(sorted(candidates),
+                   key=lambda index: (_similarity(sketch, self._sketches[index]),
+                                      -abs(self._num_lines(index) - num_lines)))
+
+    def _num_lines(self, reference_index: int) -> int:
+        return len(self._parsed_references[reference_index].keys)
+
+    def _fingerprint(self, parsed: '_ParsedText') -> 'Sketch':
+        '''
+        Returns the one-permutation MinHash sketch of a parsed text.
+        Bins that no hash fell into are None.
+        '''
+        sketch = [None] * self._sketch_size  # type: List[Optional[int]]
+        occurrences = {}  # type: Dict[str, int]
+        for transformed in parsed.keys:
+            occurrence = occurrences.get(transformed, 0)
+            occurrences[transformed] = occurrence + 1
+
+            value = hash((transformed, occurrence))
+            bin_index = value % self._sketch_size
+            current = sketch[bin_index]
+            if current is None or value < current:
+                sketch[bin_index] = value
+
+        return tuple(sketch)
+
+    def _bands(self, sketch: 'Sketch') -> 'Iterator[Tuple[int, Sketch]]':
+        '''
+        Yields the bands of sketch along with their positions. Bands
+        whose bins are all empty are skipped, since they would match
+        every text with few lines.
+        '''
+        for start in range(0, len(sketch), self._band_size):
+            band = sketch[start:start + self._band_size]
+            if any(value is not None for value in band):
+                yield start, band
+
+
+def _similarity(first: 'Sketch', second: 'Sketch') -> float:
+    '''
+    Estimates the Jaccard similarity of the line multisets that produced
+    the sketches first and second: the fraction of bins that are
+    non-empty in either sketch where the two sketches agree.
+    '''
+    num_shared = 0
+    num_non_empty = 0
+    for first_value, second_value in zip(first, second):
+        if first_value is None and second_value is None:
+            continue
+        num_non_empty += 1
+        if first_value == second_value:
+            num_shared += 1
+
+    if not num_non_empty:
+        return 1.0
+    return num_shared / num_non_empty
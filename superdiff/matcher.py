@@ -0,0 +1,240 @@
+import bisect
+
+MYPY = False
+if MYPY:  # pragma: no cover
+    from typing import Hashable, List, Optional, Sequence, Tuple  # noqa: F401
+
+    Opcode = Tuple[str, int, int, int, int]
+
+
+class PatienceMatcher:
+    '''
+    Computes ``difflib.SequenceMatcher``-style opcodes for two sequences
+    of hashable items (typically the transformed text of parsed lines).
+
+    Before falling back to ``difflib.SequenceMatcher``, the inputs are
+    split into independent segments:
+
+    1. Common prefixes and suffixes are matched directly.
+    2. Items that occur exactly once in both inputs are used as anchors
+       (as in patience diff), and the longest increasing sequence of
+       anchors splits the inputs into segments that are diffed
+       recursively.
+    3. Segments with no anchors are run-length compressed so that long
+       runs of identical items (e.g. a program printing ``0`` a million
+       times) are matched as a single item.
+
+    The opcodes returned have the same format and meaning as those
+    returned by ``difflib.SequenceMatcher.get_opcodes``.
+    '''
+
+    def __init__(self, a: 'Sequence[Hashable]'=(), b: 'Sequence[Hashable]'=()) -> None:
+        self.a = a
+        self.b = b
+        self._opcodes = None  # type: Optional[List[Opcode]]
+
+        self._identical = False
+        self.num_anchors = 0
+        self.num_fallback_segments = 0
+
+    def get_opcodes(self) -> 'List[Opcode]':
+        if self._opcodes is None:
+            opcodes = []  # type: List[Opcode]
+            if self.a == self.b:
+                self._identical = True
+                if self.a:
+                    opcodes.append(('equal', 0, len(self.a), 0, len(self.b)))
+            else:
+                self._diff(0, len(self.a), 0, len(self.b), opcodes)
+            self._opcodes = _merge_opcodes(opcodes)
+
+        return self._opcodes
+
+    @property
+    def algorithm(self) -> str:
+        '''
+        A short name for the strategy that get_opcodes used:
+
+        - ``'identical'``: The sequences were equal.
+        - ``'prefix_suffix'``: Only common prefix and suffix trimming
+          was needed.
+        - ``'patience'``: Unique anchors were used to split the
+          sequences.
+        - ``'sequence_matcher'``: No anchors were found, and the
+          run-length compressed sequences were diffed with
+          ``difflib.SequenceMatcher``.
+
+        Only meaningful after get_opcodes has been called.
+        '''
+        if self._identical:
+            return 'identical'
+        if self.num_anchors:
+            return 'patience'
+        if self.num_fallback_segments:
+            return 'sequence_matcher'
+        return 'prefix_suffix'
+
+    def _diff(self, alo: int, ahi: int, blo: int, bhi: int, opcodes: 'List[Opcode]') -> None:
+        a = self.a
+        b = self.b
+
+        prefix_start_a, prefix_start_b = alo, blo
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            alo += 1
+            blo += 1
+        if alo > prefix_start_a:
+            opcodes.append(('equal', prefix_start_a, alo, prefix_start_b, blo))
+
+        suffix_end_a, suffix_end_b = ahi, bhi
+        while ahi > alo and bhi > blo and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+
+        if alo == ahi and blo < bhi:
+            opcodes.append(('insert', alo, ahi, blo, bhi))
+        elif blo == bhi and alo < ahi:
+            opcodes.append(('delete', alo, ahi, blo, bhi))
+        elif alo < ahi and blo < bhi:
+            anchors = _find_unique_anchors(a, alo, ahi, b, blo, bhi)
+            if anchors:
+                self.num_anchors += len(anchors)
+                for anchor_a, anchor_b in anchors:
+                    self._diff(alo, anchor_a, blo, anchor_b, opcodes)
+                    opcodes.append(('equal', anchor_a, anchor_a + 1, anchor_b, anchor_b + 1))
+                    alo, blo = anchor_a + 1, anchor_b + 1
+                self._diff(alo, ahi, blo, bhi, opcodes)
+            else:
+                self._diff_runs(alo, ahi, blo, bhi, opcodes)
+
+        if ahi < suffix_end_a:
+            opcodes.append(('equal', ahi, suffix_end_a, bhi, suffix_end_b))
+
+    def _diff_runs(self, alo: int, ahi: int, blo: int, bhi: int,
+                   opcodes: 'List[Opcode]') -> None:
+        # difflib is imported here since most diffs never need it.
+        import difflib
+
+        self.num_fallback_segments += 1
+        a_runs, a_starts = _compress_runs(self.a, alo, ahi)
+        b_runs, b_starts = _compress_runs(self.b, blo, bhi)
+
+        matcher = difflib.SequenceMatcher(a=a_runs, b=b_runs)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag != 'equal':
+                opcodes.append((tag, a_starts[i1], a_starts[i2], b_starts[j1], b_starts[j2]))
+                continue
+
+            # Matched runs may have different lengths, e.g. five '0'
+            # lines vs. six '0' lines. The common part is equal and the
+            # rest is inserted or deleted.
+            for a_run, b_run in zip(range(i1, i2), range(j1, j2)):
+                first_start, first_end = a_starts[a_run], a_starts[a_run + 1]
+                second_start, second_end = b_starts[b_run], b_starts[b_run + 1]
+                common = min(first_end - first_start, second_end - second_start)
+                opcodes.append(('equal', first_start, first_start + common,
+                                second_start, second_start + common))
+                if first_start + common < first_end:
+                    opcodes.append(('delete', first_start + common, first_end,
+                                    second_end, second_end))
+                elif second_start + common < second_end:
+                    opcodes.append(('insert', first_end, first_end,
+                                    second_start + common, second_end))
+
+
+def _find_unique_anchors(a: 'Sequence[Hashable]', alo: int, ahi: int,
+                         b: 'Sequence[Hashable]', blo: int,
+                         bhi: int) -> 'List[Tuple[int, int]]':
+    '''
+    Returns the longest sequence of (a index, b index) pairs, increasing
+    in both indices, of items that occur exactly once in a[alo:ahi]
+    and exactly once in b[blo:bhi].
+    '''
+    a_indices = {}  # type: dict
+    for index in range(alo, ahi):
+        item = a[index]
+        a_indices[item] = None if item in a_indices else index
+
+    b_indices = {}  # type: dict
+    for index in range(blo, bhi):
+        item = b[index]
+        if a_indices.get(item) is not None:
+            b_indices[item] = None if item in b_indices else index
+
+    # Walk b in index order so that candidates are sorted by b index.
+    candidates = []  # type: List[Tuple[int, int]]
+    for index in range(blo, bhi):
+        item = b[index]
+        if b_indices.get(item) == index:
+            candidates.append((a_indices[item], index))
+    if not candidates:
+        return []
+
+    # Patience sorting: find the longest increasing subsequence of
+    # a indices.
+    pile_tops = []  # type: List[int]
+    pile_top_candidates = []  # type: List[int]
+    predecessors = [-1] * len(candidates)
+    for candidate_index, (a_index, _) in enumerate(candidates):
+        pile = bisect.bisect_left(pile_tops, a_index)
+        if pile > 0:
+            predecessors[candidate_index] = pile_top_candidates[pile - 1]
+        if pile == len(pile_tops):
+            pile_tops.append(a_index)
+            pile_top_candidates.append(candidate_index)
+        else:
+            pile_tops[pile] = a_index
+            pile_top_candidates[pile] = candidate_index
+
+    anchors = []
+    candidate_index = pile_top_candidates[-1]
+    while candidate_index != -1:
+        anchors.append(candidates[candidate_index])
+        candidate_index = predecessors[candidate_index]
+    anchors.reverse()
+    return anchors
+
+
+def _compress_runs(items: 'Sequence[Hashable]', lo: int,
+                   hi: int) -> 'Tuple[List[Hashable], List[int]]':
+    '''
+    Collapses consecutive identical items in items[lo:hi] into a single
+    item. Also returns the index in items at which each run starts,
+    followed by hi.
+    '''
+    runs = []  # type: List[Hashable]
+    starts = []  # type: List[int]
+    index = lo
+    while index < hi:
+        item = items[index]
+        run_end = index + 1
+        while run_end < hi and items[run_end] == item:
+            run_end += 1
+        runs.append(item)
+        starts.append(index)
+        index = run_end
+
+    starts.append(hi)
+    return runs, starts
+
+
+def _merge_opcodes(opcodes: 'List[Opcode]') -> 'List[Opcode]':
+    '''
+    Combines adjacent opcodes with the same tag, and adjacent deletes
+    and inserts into replaces, so that the result matches the shape of
+    SequenceMatcher's output.
+    '''
+    merged = []  # type: List[Opcode]
+    for opcode in opcodes:
+        if not merged:
+            merged.append(opcode)
+            continue
+
+        prev_tag, prev_i1, _, prev_j1, _ = merged[-1]
+        tag, _, i2, _, j2 = opcode
+        if prev_tag == tag or (prev_tag != 'equal' and tag != 'equal'):
+            merged_tag = tag if prev_tag == tag else 'replace'
+            merged[-1] = (merged_tag, prev_i1, i2, prev_j1, j2)
+        else:
+            merged.append(opcode)
+
+    return merged
@@ -1,9 +1,13 @@
 import re
-from typing import Sequence
+
+MYPY = False
+if MYPY:  # pragma: no cover
+    from typing import Sequence  # noqa: F401
 
 
 _NEWLINE_CHARS = r'(\r\n)|(\r)|(\n)'  # KEEP THESE IN ORDER
 _NEWLINE_THEN_WHITESPACE = r'({newline}|[ \t])*'.format(newline=_NEWLINE_CHARS)
+_FIRST_NEWLINE = re.compile(_NEWLINE_CHARS)
 
 
 class Parser:
@@ -50,6 +54,14 @@ class Parser:
             ignore_trailing_whitespace=ignore_trailing_whitespace,
         )
 
+        self._token_regex = re.compile('|'.join(
+            '(?P<{0}>{1})'.format(token_type, regex)
+            for token_type, regex in self._get_token_spec()))
+
+    @property
+    def settings(self) -> 'Parser.Settings':
+        return self._settings
+
     class Settings:
         # NOTE: we're only supporting \n \r and \r\n as newlines
         def __init__(self,
@@ -68,7 +80,29 @@ class Parser:
             self.ignore_leading_whitespace = ignore_leading_whitespace
             self.ignore_trailing_whitespace = ignore_trailing_whitespace
 
-    def _get_token_spec(self) -> Sequence[tuple]:
+            # The settings are compiled once into the functions below so
+            # that Tokens and Lines don't need to check them for every
+            # token and line.
+            self.transform_word = _WORD_TRANSFORMS[bool(ignore_case)]
+
+            if ignore_non_newline_whitespace:
+                self.transform_whitespace = _remove
+            elif ignore_non_newline_whitespace_changes:
+                self.transform_whitespace = _single_space
+            else:
+                self.transform_whitespace = _identity
+
+            if ignore_newline_changes:
+                self.transform_newline = _single_newline
+            elif ignore_blank_lines:
+                self.transform_newline = _first_newline
+            else:
+                self.transform_newline = _identity
+
+            self.strip_line = _STRIP_TRANSFORMS[
+                bool(ignore_leading_whitespace), bool(ignore_trailing_whitespace)]
+
+    def _get_token_spec(self) -> 'Sequence[tuple]':
         return [
             # IMPORTANT: DO NOT CHANGE THE ORDER OF THESE!!!!
             ('newline', self._newline_regex),
@@ -76,15 +110,11 @@ class Parser:
             ('word', self._word_regex)
         ]
 
-    def parse(self, text: str) -> Sequence['Line']:
+    def parse(self, text: str) -> 'Sequence[Line]':
         lines = []
 
-        token_regex = '|'.join(
-            '(?P<{0}>{1})'.format(token_type, regex)
-            for token_type, regex in self._get_token_spec())
-
         tokens = []
-        for match in re.finditer(token_regex, text):
+        for match in self._token_regex.finditer(text):
             token = token_factory(match.lastgroup, match, self._settings)
             tokens.append(token)
 
@@ -101,29 +131,24 @@ class Line:
     a NewlineToken.
     '''
 
-    def __init__(self, tokens: Sequence['Token'], settings: Parser.Settings) -> None:
+    def __init__(self, tokens: 'Sequence[Token]', settings: Parser.Settings) -> None:
         self._tokens = tokens
         self._settings = settings
         self._hash = None  # type: int
 
     @property
     def transformed_text(self) -> str:
-        text = ''.join(token.transformed_text for token in self._tokens)
-
-        if (self._settings.ignore_leading_whitespace and
-                self._settings.ignore_trailing_whitespace):
-            text = text.strip()
-        elif self._settings.ignore_leading_whitespace:
-            text = text.lstrip()
-        elif self._settings.ignore_trailing_whitespace:
-            text = text.rstrip()
-
-        return text
+        return self._settings.strip_line(
+            ''.join(token.transformed_text for token in self._tokens))
 
     @property
     def original_text(self) -> str:
         return ''.join(token.original_text for token in self._tokens)
 
+    @property
+    def num_tokens(self) -> int:
+        return len(self._tokens)
+
     def __hash__(self):
         if self._hash is None:
             self._hash = hash(self.transformed_text)
@@ -171,11 +196,7 @@ class WordToken(Token):
     '''
 
     def _get_transformed_text(self) -> str:
-        text = self._text
-        if self._settings.ignore_case:
-            text = text.lower()
-
-        return text
+        return self._settings.transform_word(self._text)
 
 
 class NewlineToken(Token):
@@ -187,13 +208,7 @@ class NewlineToken(Token):
         super().__init__(regex_match, settings)
 
     def _get_transformed_text(self) -> str:
-        if self._settings.ignore_newline_changes:
-            return '\n'
-
-        if self._settings.ignore_blank_lines:
-            return re.match(_NEWLINE_CHARS, self._text).group()
-
-        return super()._get_transformed_text()
+        return self._settings.transform_newline(self._text)
 
 
 class WhitespaceToken(Token):
@@ -203,13 +218,7 @@ class WhitespaceToken(Token):
     '''
 
     def _get_transformed_text(self):
-        if self._settings.ignore_non_newline_whitespace:
-            return ''
-
-        if self._settings.ignore_non_newline_whitespace_changes:
-            return ' '
-
-        return super()._get_transformed_text()
+        return self._settings.transform_whitespace(self._text)
 
 
 def token_factory(token_type: str, regex_match, parser_settings) -> Token:
@@ -224,3 +233,37 @@ _TOKEN_TYPES = {
     'newline': NewlineToken,
     'whitespace': WhitespaceToken,
 }
+
+
+def _identity(text: str) -> str:
+    return text
+
+
+def _remove(text: str) -> str:
+    return ''
+
+
+def _single_space(text: str) -> str:
+    return ' '
+
+
+def _single_newline(text: str) -> str:
+    return '\n'
+
+
+def _first_newline(text: str) -> str:
+    return _FIRST_NEWLINE.match(text).group()
+
+
+_WORD_TRANSFORMS = {
+    False: _identity,
+    True: str.lower,
+}
+
+# Keys are (ignore_leading_whitespace, ignore_trailing_whitespace)
+_STRIP_TRANSFORMS = {
+    (False, False): _identity,
+    (True, False): str.lstrip,
+    (False, True): str.rstrip,
+    (True, True): str.strip,
+}
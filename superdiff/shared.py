@@ -0,0 +1,270 @@
+import collections.abc
+import itertools
+import mmap
+import struct
+import threading
+
+from .parser import Parser
+
+MYPY = False
+if MYPY:  # pragma: no cover
+    from typing import Iterator, List, Optional, Sequence, Union  # noqa: F401
+
+    from .parser import Line  # noqa: F401
+
+
+_MAGIC = b'SDIF'
+_VERSION = 1
+# magic, version, settings mask, number of lines, padding to 8 bytes
+_HEADER = struct.Struct('=4sIIxxxxQ')
+
+# Held while resource_tracker.register is swapped out in attach.
+_untracked_lock = threading.Lock()
+
+_SETTINGS_NAMES = (
+    'ignore_case',
+    'ignore_non_newline_whitespace',
+    'ignore_non_newline_whitespace_changes',
+    'ignore_newline_changes',
+    'ignore_blank_lines',
+    'ignore_leading_whitespace',
+    'ignore_trailing_whitespace',
+)
+
+
+class SharedDocument(collections.abc.Sequence):
+    '''
+    A read-only parsed document stored in a single flat buffer, either a
+    ``multiprocessing.shared_memory.SharedMemory`` block or an mmap'd
+    file, so that several processes can use one copy of a large
+    reference text without each parsing and storing it.
+
+    A SharedDocument can be passed to :meth:`superdiff.Differ.compare`
+    in place of a string, as long as the Differ uses the same settings
+    as the Parser that produced the document.
+
+    Use :meth:`create` or :meth:`write_file` in one process and
+    :meth:`attach` or :meth:`open_file` in the others.
+
+    Buffer layout (native byte order)::
+
+        header
+        original text offsets     (num lines + 1) x uint64
+        transformed text offsets  (num lines + 1) x uint64
+        token counts              num lines x uint64
+        original text             UTF-8
+        transformed text          UTF-8
+    '''
+
+    def __init__(self, buffer, backing=None) -> None:
+        '''
+        Wraps a buffer laid out as described above. Prefer the
+        classmethods over calling this directly.
+
+        :param backing: The object that owns buffer (a SharedMemory or
+            mmap object). It is closed by :meth:`close`.
+        '''
+        self._backing = backing
+        self._buffer = memoryview(buffer)
+        if not self._buffer.readonly:
+            self._buffer = self._buffer.toreadonly()
+
+        magic, version, self._settings_mask, self._num_lines = _HEADER.unpack_from(self._buffer)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError('Buffer does not contain a SharedDocument')
+
+        offsets_start = _HEADER.size
+        offsets_end = offsets_start + 8 * (3 * self._num_lines + 2)
+        offsets = self._buffer[offsets_start:offsets_end].cast('Q')
+        self._offsets = offsets
+        self._original_offsets = offsets[:self._num_lines + 1]
+        self._transformed_offsets = offsets[self._num_lines + 1:2 * self._num_lines + 2]
+        self._token_counts = offsets[2 * self._num_lines + 2:]
+
+    @classmethod
+    def create(cls, parser: Parser, text: str, name: 'Optional[str]'=None) -> 'SharedDocument':
+        '''
+        Parses text and stores the result in a new SharedMemory block.
+        Other processes can pass :attr:`name` to :meth:`attach`.
+
+        The creating process is responsible for calling :meth:`unlink`
+        once no process needs the document.
+        '''
+        from multiprocessing import shared_memory
+
+        data = _serialize(parser, text)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=max(1, len(data)))
+        shm.buf[:len(data)] = data
+        return cls(shm.buf[:len(data)], shm)
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedDocument':
+        '''
+        Attaches read-only to a document created with :meth:`create`.
+
+        Before Python 3.13, SharedMemory registers every block it opens
+        with the resource tracker, which would destroy the block when
+        this process exits. Child processes started by multiprocessing
+        share their parent's tracker, so the registration can't simply
+        be undone afterwards without also removing the creator's. It is
+        skipped instead.
+        '''
+        from multiprocessing import shared_memory
+
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            from multiprocessing import resource_tracker
+
+            with _untracked_lock:
+                register = resource_tracker.register
+                resource_tracker.register = lambda name, rtype: None
+                try:
+                    shm = shared_memory.SharedMemory(name=name)
+                finally:
+                    resource_tracker.register = register
+        return cls(shm.buf, shm)
+
+    @classmethod
+    def write_file(cls, parser: Parser, text: str, path: str) -> None:
+        '''
+        Parses text and writes the result to path, to be loaded with
+        :meth:`open_file`.
+        '''
+        with open(path, 'wb') as f:
+            f.write(_serialize(parser, text))
+
+    @classmethod
+    def open_file(cls, path: str) -> 'SharedDocument':
+        '''
+        Memory-maps a file written by :meth:`write_file` read-only.
+        Processes that open the same file share its pages.
+        '''
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapped, mapped)
+
+    @property
+    def name(self) -> 'Optional[str]':
+        '''
+        The name of the SharedMemory block, or None for file-backed
+        documents.
+        '''
+        return getattr(self._backing, 'name', None)
+
+    def check_settings(self, parser: Parser) -> None:
+        '''
+        Raises ValueError if this document was produced by a Parser
+        whose settings differ from those of parser.
+        '''
+        if self._settings_mask != _settings_mask(parser):
+            raise ValueError(
+                'This SharedDocument was parsed with different settings than the given parser')
+
+    def close(self) -> None:
+        '''
+        Releases this process's view of the document. Lines obtained
+        from the document can no longer be used.
+        '''
+        self._original_offsets.release()
+        self._transformed_offsets.release()
+        self._token_counts.release()
+        self._offsets.release()
+        self._buffer.release()
+        if self._backing is not None:
+            self._backing.close()
+
+    def unlink(self) -> None:
+        '''
+        Requests that the underlying SharedMemory block be destroyed.
+        Only the creating process should call this.
+
+        Raises ValueError if this document is not backed by SharedMemory
+        (e.g. it came from :meth:`open_file`).
+        '''
+        if self.name is None:
+            raise ValueError('Only documents backed by SharedMemory can be unlinked')
+        self._backing.unlink()
+
+    def __enter__(self) -> 'SharedDocument':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._num_lines
+
+    def __getitem__(self, index: 'Union[int, slice]') -> 'Union[SharedLine, List[SharedLine]]':
+        if isinstance(index, slice):
+            return [SharedLine(self, i) for i in range(*index.indices(self._num_lines))]
+
+        if index < 0:
+            index += self._num_lines
+        if not 0 <= index < self._num_lines:
+            raise IndexError('SharedDocument index out of range')
+
+        return SharedLine(self, index)
+
+    def __iter__(self) -> 'Iterator[SharedLine]':
+        for index in range(self._num_lines):
+            yield SharedLine(self, index)
+
+    def _get_text(self, offsets, index: int) -> str:
+        return str(self._buffer[offsets[index]:offsets[index + 1]], 'utf-8')
+
+
+class SharedLine:
+    '''
+    A lightweight view of one line of a :class:`SharedDocument`. Provides
+    the same text attributes as :class:`superdiff.parser.Line`.
+    '''
+
+    __slots__ = ('_document', '_index')
+
+    def __init__(self, document: SharedDocument, index: int) -> None:
+        self._document = document
+        self._index = index
+
+    @property
+    def transformed_text(self) -> str:
+        return self._document._get_text(self._document._transformed_offsets, self._index)
+
+    @property
+    def original_text(self) -> str:
+        return self._document._get_text(self._document._original_offsets, self._index)
+
+    @property
+    def num_tokens(self) -> int:
+        return self._document._token_counts[self._index]
+
+    def __str__(self):
+        return self.original_text
+
+
+def _settings_mask(parser: Parser) -> int:
+    return sum(1 << bit for bit, name in enumerate(_SETTINGS_NAMES)
+               if getattr(parser.settings, name))
+
+
+def _serialize(parser: Parser, text: str) -> bytes:
+    lines = parser.parse(text)  # type: Sequence[Line]
+    original = [line.original_text.encode() for line in lines]
+    transformed = [line.transformed_text.encode() for line in lines]
+
+    data_start = _HEADER.size + 8 * (3 * len(lines) + 2)
+    original_offsets = list(itertools.accumulate(
+        itertools.chain((data_start,), (len(chunk) for chunk in original))))
+    transformed_offsets = list(itertools.accumulate(
+        itertools.chain((original_offsets[-1],), (len(chunk) for chunk in transformed))))
+
+    counts = [line.num_tokens for line in lines]
+
+    return b''.join((
+        _HEADER.pack(_MAGIC, _VERSION, _settings_mask(parser), len(lines)),
+        struct.pack('={}Q'.format(len(original_offsets)), *original_offsets),
+        struct.pack('={}Q'.format(len(transformed_offsets)), *transformed_offsets),
+        struct.pack('={}Q'.format(len(counts)), *counts),
+        b''.join(original),
+        b''.join(transformed),
+    ))
@@ -1,3 +1,6 @@
+import os
+import subprocess
+import sys
 import unittest
 
 from superdiff.differ import Differ
@@ -92,5 +95,69 @@ class DifferTestCase(unittest.TestCase):
         self.assertEqual(expected, list(diff))
 
 
+class DifferMetricsTestCase(unittest.TestCase):
+    def test_metrics_callback_called(self):
+        recorded = []
+        differ = Differ(metrics_callback=recorded.append)
+        diff = differ.compare('spam\nsausage', 'spam\negg\nsausage')
+
+        self.assertEqual(3, len(list(diff)))
+        self.assertEqual(1, len(recorded))
+        metrics = recorded[0]
+        self.assertEqual(2, metrics.first_num_lines)
+        self.assertEqual(3, metrics.second_num_lines)
+        self.assertEqual(3, metrics.first_num_tokens)
+        self.assertEqual(5, metrics.second_num_tokens)
+        self.assertEqual(3, metrics.num_opcodes)
+        self.assertEqual('prefix_suffix', metrics.algorithm)
+        for seconds in (metrics.parse_first_seconds, metrics.parse_second_seconds,
+                        metrics.match_seconds, metrics.materialize_seconds):
+            self.assertGreaterEqual(seconds, 0)
+        self.assertGreaterEqual(metrics.total_seconds, metrics.match_seconds)
+
+    def test_metrics_compare_hunks(self):
+        recorded = []
+        differ = Differ(metrics_callback=recorded.append)
+        differ.compare_hunks('spam\nsausage', 'spam\negg\nsausage')
+        differ.equal('spam', 'egg')
+
+        self.assertEqual(1, len(recorded))
+        self.assertEqual(3, recorded[0].num_opcodes)
+        self.assertEqual(3, recorded[0].second_num_lines)
+
+    def test_metrics_algorithm(self):
+        recorded = []
+        differ = Differ(metrics_callback=recorded.append)
+        differ.compare('spam', 'spam')
+        differ.compare('q\na\nx\nb\nq', 'a\ny\nb')
+        differ.compare('0\n0\n0', '1\n1')
+
+        self.assertEqual(['identical', 'patience', 'sequence_matcher'],
+                         [metrics.algorithm for metrics in recorded])
+
+
+class DifferEqualTestCase(unittest.TestCase):
+    def test_equal(self):
+        self.assertTrue(Differ().equal('spam\negg', 'spam\negg'))
+        self.assertTrue(Differ(ignore_case=True).equal('spam\negg', 'SPAM\nEgg'))
+        self.assertFalse(Differ().equal('spam\negg', 'SPAM\nEgg'))
+        self.assertFalse(Differ().equal('spam\negg', 'spam'))
+        self.assertTrue(Differ().equal('', ''))
+
+    def test_equal_does_not_import_diff_engine(self):
+        code = '\n'.join([
+            'import sys',
+            'import superdiff',
+            'assert "superdiff.differ" not in sys.modules',
+            'superdiff.Differ().equal("spam", "egg")',
+            'print(sorted(name for name in ("difflib", "typing", "superdiff.shared")',
+            '             if name in sys.modules))',
+        ])
+        repo_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        output = subprocess.check_output(
+            [sys.executable, '-c', code], cwd=repo_root, universal_newlines=True)
+        self.assertEqual('[]', output.strip())
+
+
 if __name__ == '__main__':
     unittest.main()
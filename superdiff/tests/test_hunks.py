@@ -0,0 +1,78 @@
+import json
+import unittest
+
+from superdiff.differ import Differ
+
+
+class CompareHunksTestCase(unittest.TestCase):
+    def setUp(self):
+        self.left = '\n'.join(('q', 'a', 'b', 'x', 'c', 'd', 'e'))
+        self.right = '\n'.join(('a', 'b', 'y', 'c', 'd', 'f', 'e'))
+
+    def test_hunks(self):
+        diff = Differ().compare_hunks(self.left, self.right)
+        expected = [
+            ('delete',  0, 1, 0, 0, 'q\n', ''),
+            ('equal',   1, 3, 0, 2, 'a\nb\n', 'a\nb\n'),
+            ('replace', 3, 4, 2, 3, 'x\n', 'y\n'),
+            ('equal',   4, 6, 3, 5, 'c\nd\n', 'c\nd\n'),
+            ('insert',  6, 6, 5, 6, '', 'f\n'),
+            ('equal',   6, 7, 6, 7, 'e', 'e'),
+        ]
+        actual = [(hunk.tag, hunk.first_start, hunk.first_end, hunk.second_start,
+                   hunk.second_end, hunk.first_text, hunk.second_text)
+                  for hunk in diff]
+        self.assertEqual(expected, actual)
+        self.assertFalse(diff.truncated)
+
+    def test_texts_equal(self):
+        diff = Differ(ignore_case=True).compare_hunks('spam\negg', 'SPAM\negg')
+        self.assertEqual(0, len(diff))
+        self.assertFalse(diff.truncated)
+
+    def test_max_hunks(self):
+        diff = Differ().compare_hunks(self.left, self.right, max_hunks=2)
+        self.assertEqual(['delete', 'equal', 'replace', 'equal'], [hunk.tag for hunk in diff])
+        self.assertTrue(diff.truncated)
+
+        diff = Differ().compare_hunks(self.left, self.right, max_hunks=3)
+        self.assertEqual(6, len(diff))
+        self.assertFalse(diff.truncated)
+
+    def test_max_bytes(self):
+        full_size = len(Differ().compare_hunks(self.left, self.right).to_json())
+
+        diff = Differ().compare_hunks(self.left, self.right, max_bytes=full_size)
+        self.assertEqual(6, len(diff))
+        self.assertFalse(diff.truncated)
+
+        diff = Differ().compare_hunks(self.left, self.right, max_bytes=full_size - 1)
+        self.assertEqual(5, len(diff))
+        self.assertTrue(diff.truncated)
+        self.assertLessEqual(len(diff.to_json()), full_size - 1)
+
+    def test_max_bytes_counts_json_escapes(self):
+        left = '\x01\x02\x03\n' * 10
+        right = 'spam\n' * 10
+        for max_bytes in range(30, 400, 10):
+            diff = Differ().compare_hunks(left, right, max_bytes=max_bytes)
+            self.assertLessEqual(len(diff.to_json()), max_bytes)
+
+    def test_to_json(self):
+        diff = Differ().compare_hunks('spam\négg\n', 'spam\nEGG\n')
+        expected = {
+            'truncated': False,
+            'hunks': [
+                ['equal', 0, 1, 0, 1],
+                ['replace', 1, 2, 1, 2, 'égg\n', 'EGG\n'],
+            ],
+        }
+        self.assertEqual(expected, json.loads(diff.to_json().decode()))
+
+        expected['hunks'][0].extend(['spam\n', 'spam\n'])
+        self.assertEqual(expected, json.loads(diff.to_json(include_equal_text=True).decode()))
+        self.assertNotIn(b' ', diff.to_json())
+
+
+if __name__ == '__main__':
+    unittest.main()
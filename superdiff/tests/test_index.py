@@ -0,0 +1,78 @@
+import unittest
+from unittest import mock
+
+from superdiff.differ import Differ
+from superdiff.index import ReferenceIndex, _similarity
+
+
+class ReferenceIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.references = [
+            '\n'.join('spam {}'.format(i) for i in range(100)),
+            '\n'.join('egg {}'.format(i) for i in range(100)),
+            '\n'.join('sausage {}'.format(i) for i in range(100)),
+            '0\n' * 100,
+        ]
+
+    def test_closest_exact_match(self):
+        index = ReferenceIndex(Differ(), self.references)
+        for reference_index, reference in enumerate(self.references):
+            self.assertEqual(reference_index, index.closest(reference))
+
+    def test_closest_with_differences(self):
+        index = ReferenceIndex(Differ(), self.references)
+        lines = self.references[1].split('\n')
+        lines[10] = 'bacon'
+        lines[50:55] = []
+        self.assertEqual(1, index.closest('\n'.join(lines)))
+
+        self.assertEqual(3, index.closest('0\n' * 90 + '1\n'))
+
+    def test_closest_respects_differ_settings(self):
+        text = self.references[2].upper()
+        self.assertEqual(2, ReferenceIndex(Differ(ignore_case=True), self.references).closest(text))
+
+    def test_closest_no_lines_in_common(self):
+        index = ReferenceIndex(Differ(), ['spam\negg', 'spam\negg\nsausage\nbacon'])
+        self.assertEqual(1, index.closest('a\nb\nc\nd\ne'))
+        self.assertEqual(0, index.closest(''))
+
+    def test_closest_only_scores_references_sharing_a_band(self):
+        references = ['\n'.join('{} {}'.format(word, i) for i in range(100))
+                      for word in ('spam', 'egg', 'sausage', 'bacon', 'lobster', 'thermidor')]
+        index = ReferenceIndex(Differ(), references)
+        lines = references[4].split('\n')
+        lines[10] = 'bacon'
+
+        with mock.patch('superdiff.index._similarity', wraps=_similarity) as similarity:
+            self.assertEqual(4, index.closest('\n'.join(lines)))
+        self.assertEqual(1, similarity.call_count)
+
+    def test_compare(self):
+        index = ReferenceIndex(Differ(), self.references)
+        lines = self.references[0].split('\n')
+        lines[3] = 'spam'
+        text = '\n'.join(lines)
+
+        reference_index, diff = index.compare(text)
+        self.assertEqual(0, reference_index)
+        self.assertEqual(list(Differ().compare(self.references[0], text)), list(diff))
+
+    def test_compare_parses_text_once(self):
+        differ = Differ()
+        index = ReferenceIndex(differ, self.references)
+        with mock.patch.object(differ.parser, 'parse', wraps=differ.parser.parse) as parse:
+            reference_index, diff = index.compare(self.references[1] + '\nspam')
+
+        self.assertEqual(1, reference_index)
+        self.assertEqual(1, parse.call_count)
+        self.assertEqual(list(Differ().compare(self.references[1], self.references[1] + '\nspam')),
+                         list(diff))
+
+    def test_no_references(self):
+        with self.assertRaises(ValueError):
+            ReferenceIndex(Differ(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import random
+import time
+import unittest
+
+from superdiff.matcher import PatienceMatcher
+
+
+class PatienceMatcherTestCase(unittest.TestCase):
+    def _check_opcodes(self, a, b, opcodes):
+        '''
+        Checks that opcodes are contiguous, cover both sequences, and
+        that equal opcodes only pair up equal items.
+        '''
+        first_pos = 0
+        second_pos = 0
+        prev_tag = None
+        for tag, i1, i2, j1, j2 in opcodes:
+            self.assertEqual(first_pos, i1)
+            self.assertEqual(second_pos, j1)
+            self.assertNotEqual(prev_tag, tag)
+            if tag == 'equal':
+                self.assertEqual(a[i1:i2], b[j1:j2])
+            elif tag == 'insert':
+                self.assertEqual(i1, i2)
+            elif tag == 'delete':
+                self.assertEqual(j1, j2)
+            first_pos, second_pos, prev_tag = i2, j2, tag
+
+        self.assertEqual(len(a), first_pos)
+        self.assertEqual(len(b), second_pos)
+
+    def test_equal_sequences(self):
+        a = list('spam')
+        self.assertEqual([('equal', 0, 4, 0, 4)], PatienceMatcher(a, list(a)).get_opcodes())
+
+    def test_empty_sequences(self):
+        self.assertEqual([], PatienceMatcher([], []).get_opcodes())
+        self.assertEqual([('insert', 0, 0, 0, 2)], PatienceMatcher([], ['a', 'b']).get_opcodes())
+        self.assertEqual([('delete', 0, 2, 0, 0)], PatienceMatcher(['a', 'b'], []).get_opcodes())
+
+    def test_unique_anchors(self):
+        a = ['q', 'a', 'b', 'x', 'c', 'd', 'e']
+        b = ['a', 'b', 'y', 'c', 'd', 'f', 'e']
+        expected = [
+            ('delete', 0, 1, 0, 0),
+            ('equal', 1, 3, 0, 2),
+            ('replace', 3, 4, 2, 3),
+            ('equal', 4, 6, 3, 5),
+            ('insert', 6, 6, 5, 6),
+            ('equal', 6, 7, 6, 7),
+        ]
+        self.assertEqual(expected, PatienceMatcher(a, b).get_opcodes())
+
+    def test_runs_of_different_lengths(self):
+        a = ['0'] * 5 + ['1'] * 3 + ['spam']
+        b = ['0'] * 7 + ['1'] * 2 + ['egg']
+        expected = [
+            ('equal', 0, 5, 0, 5),
+            ('insert', 5, 5, 5, 7),
+            ('equal', 5, 7, 7, 9),
+            ('replace', 7, 9, 9, 10),
+        ]
+        self.assertEqual(expected, PatienceMatcher(a, b).get_opcodes())
+
+    def test_random_sequences_produce_valid_opcodes(self):
+        rand = random.Random(42)
+        for _ in range(200):
+            a = [rand.choice('abcdef') for _ in range(rand.randrange(30))]
+            b = [rand.choice('abcdef') for _ in range(rand.randrange(30))]
+            self._check_opcodes(a, b, PatienceMatcher(a, b).get_opcodes())
+
+    def test_large_repetitive_sequences_are_fast(self):
+        a = ['0'] * 500000 + ['spam'] + ['0'] * 500000
+        b = ['0'] * 500000 + ['egg'] + ['0'] * 499999 + ['1']
+
+        start = time.perf_counter()
+        opcodes = PatienceMatcher(a, b).get_opcodes()
+        elapsed = time.perf_counter() - start
+
+        self._check_opcodes(a, b, opcodes)
+        self.assertEqual(('replace', 500000, 500001, 500000, 500001), opcodes[1])
+        self.assertLess(elapsed, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
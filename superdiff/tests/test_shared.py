@@ -0,0 +1,142 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from superdiff.differ import Differ
+from superdiff.parser import Parser
+from superdiff.shared import SharedDocument
+
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class SharedDocumentTestCase(unittest.TestCase):
+    def setUp(self):
+        self.text = 'spam\r\nEGG  sausage\n\néclair\tspam'
+        self.other = 'spam\negg sausage\n\nbacon'
+        self.differ = Differ(ignore_case=True)
+
+    def _check_document(self, document):
+        lines = self.differ.parser.parse(self.text)
+        self.assertEqual(len(lines), len(document))
+        for expected, actual in zip(lines, document):
+            self.assertEqual(expected.original_text, actual.original_text)
+            self.assertEqual(expected.transformed_text, actual.transformed_text)
+            self.assertEqual(expected.num_tokens, actual.num_tokens)
+
+        self.assertEqual(lines[-1].original_text, document[-1].original_text)
+        self.assertEqual([line.original_text for line in lines[1:3]],
+                         [line.original_text for line in document[1:3]])
+        with self.assertRaises(IndexError):
+            document[len(lines)]
+
+        self.assertEqual(list(self.differ.compare(self.text, self.other)),
+                         list(self.differ.compare(document, self.other)))
+        self.assertEqual(list(self.differ.compare(self.other, self.text)),
+                         list(self.differ.compare(self.other, document)))
+        self.assertEqual([], list(self.differ.compare(document, self.text)))
+
+    def test_shared_memory(self):
+        document = SharedDocument.create(self.differ.parser, self.text)
+        try:
+            with document:
+                self._check_document(document)
+
+                with SharedDocument.attach(document.name) as attached:
+                    self._check_document(attached)
+        finally:
+            document.unlink()
+
+    def test_shared_memory_other_process(self):
+        # Run in a fresh interpreter so that its resource tracker (shared
+        # with the pool's worker) reports any errors to a pipe we can read.
+        script = '\n'.join([
+            'import multiprocessing',
+            'from superdiff.differ import Differ',
+            'from superdiff.shared import SharedDocument',
+            '',
+            'def compare(name, text):',
+            '    with SharedDocument.attach(name) as document:',
+            '        return list(Differ(ignore_case=True).compare(document, text))',
+            '',
+            "if __name__ == '__main__':",
+            '    differ = Differ(ignore_case=True)',
+            '    document = SharedDocument.create(differ.parser, {!r})'.format(self.text),
+            '    try:',
+            '        with document:',
+            "            context = multiprocessing.get_context('spawn')",
+            '            with context.Pool(1) as pool:',
+            '                print(pool.apply(compare, (document.name, {!r})))'.format(
+                self.other),
+            '    finally:',
+            '        document.unlink()',
+        ])
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'other_process.py')
+            with open(path, 'w') as f:
+                f.write(script)
+
+            result = subprocess.run(
+                [sys.executable, path], cwd=_REPO_ROOT,
+                env=dict(os.environ, PYTHONPATH=_REPO_ROOT),
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True,
+                check=True)
+
+        self.assertEqual('', result.stderr)
+        self.assertEqual(str(list(self.differ.compare(self.text, self.other))),
+                         result.stdout.strip())
+
+    def test_shared_memory_survives_unrelated_process_exit(self):
+        document = SharedDocument.create(self.differ.parser, self.text)
+        try:
+            with document:
+                code = '\n'.join([
+                    'from superdiff.shared import SharedDocument',
+                    'with SharedDocument.attach({!r}) as document:'.format(document.name),
+                    '    print(len(document))',
+                ])
+                output = subprocess.check_output(
+                    [sys.executable, '-c', code], cwd=_REPO_ROOT, universal_newlines=True,
+                    stderr=subprocess.STDOUT)
+                self.assertEqual(str(len(document)), output.strip())
+
+                with SharedDocument.attach(document.name) as attached:
+                    self._check_document(attached)
+        finally:
+            document.unlink()
+
+    def test_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'document')
+            SharedDocument.write_file(self.differ.parser, self.text, path)
+            with SharedDocument.open_file(path) as document:
+                self.assertIsNone(document.name)
+                self._check_document(document)
+                with self.assertRaises(ValueError):
+                    document.unlink()
+
+    def test_empty_document(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'document')
+            SharedDocument.write_file(self.differ.parser, '', path)
+            with SharedDocument.open_file(path) as document:
+                self.assertEqual(0, len(document))
+                self.assertEqual([], list(self.differ.compare(document, '')))
+
+    def test_settings_mismatch(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'document')
+            SharedDocument.write_file(Parser(), self.text, path)
+            with SharedDocument.open_file(path) as document:
+                with self.assertRaises(ValueError):
+                    list(self.differ.compare(document, self.other))
+
+    def test_invalid_buffer(self):
+        with self.assertRaises(ValueError):
+            SharedDocument(bytes(64))
+
+
+if __name__ == '__main__':
+    unittest.main()